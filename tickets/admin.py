@@ -1,17 +1,172 @@
 from django.contrib import admin
-from .models import Category, Ticket, Comment
+from django.contrib.admin.views.main import ChangeList, PAGE_VAR
+from django.core.paginator import Paginator, EmptyPage
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from .models import Category, Ticket, Comment, SLAPolicy
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Evita el COUNT(*) completo en los changelists grandes.
+    Sin filtros en PostgreSQL usa la estimación del planner (reltuples);
+    en el resto de casos cuenta como mucho COUNT_LIMIT filas.
+
+    `count_kind` indica si el total es 'exact', 'capped' o 'estimated'.
+    Si no es exacto se pueden pedir páginas más allá del total.
+    """
+    COUNT_LIMIT = 10000
+    count_kind = 'exact'
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if not queryset.query.where and connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples FROM pg_class WHERE relname = %s',
+                    [queryset.model._meta.db_table]
+                )
+                row = cursor.fetchone()
+            if row and row[0] > self.COUNT_LIMIT:
+                self.count_kind = 'estimated'
+                return int(row[0])
+        count = queryset[:self.COUNT_LIMIT + 1].count()
+        if count > self.COUNT_LIMIT:
+            self.count_kind = 'capped'
+            return self.COUNT_LIMIT
+        return count
+
+    @property
+    def count_is_exact(self):
+        self.count  # count_kind se fija al calcular el total
+        return self.count_kind == 'exact'
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if self.count_is_exact or int(number) < 1:
+                raise
+            return int(number)
+
+    def page(self, number):
+        if self.count_is_exact:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        return self._get_page(self.object_list[bottom:bottom + self.per_page], number, self)
+
+
+class EstimatedCountChangeList(ChangeList):
+    """
+    Enlaces anterior/siguiente para cuando el total no es exacto
+    (ver admin/tickets/pagination.html).
+    """
+
+    @property
+    def previous_page_query(self):
+        if self.page_num > 1:
+            return self.get_query_string({PAGE_VAR: self.page_num - 1})
+
+    @property
+    def next_page_query(self):
+        if len(self.result_list) >= self.list_per_page:
+            return self.get_query_string({PAGE_VAR: self.page_num + 1})
+
+
+def prefix_upper_bound(term):
+    """
+    Menor cadena mayor que todas las que empiezan por `term` en orden de
+    code point (el último carácter +1), o None si no existe.
+    """
+    last = ord(term[-1])
+    if last >= 0x10FFFF:
+        return None
+    return term[:-1] + chr(last + 1)
+
+
+class PrefixSearchMixin:
+    """
+    Búsqueda que siempre usa un índice: ID exacto si el término es un
+    número y, si no, prefijo (distingue mayúsculas) de alguno de los
+    `prefix_search_fields`, que deben estar indexados.
+    """
+    id_search_field = 'pk'
+    prefix_search_fields = ()
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        if term.isdigit():
+            return queryset.filter(**{self.id_search_field: int(term)}), False
+        if not self.prefix_search_fields:
+            return queryset.none(), False
+
+        upper = prefix_upper_bound(term)
+        condition = Q()
+        for field in self.prefix_search_fields:
+            if connections[queryset.db].vendor == 'sqlite' and upper is not None:
+                # En SQLite LIKE no usa el índice (ignora mayúsculas y el
+                # índice es BINARY); un rango sí. BINARY compara bytes UTF-8,
+                # que siguen el orden de code point, así que el rango
+                # [term, upper) contiene exactamente los valores con ese prefijo.
+                condition |= Q(**{f'{field}__gte': term, f'{field}__lt': upper})
+            else:
+                # PostgreSQL: LIKE 'term%' sobre un índice varchar_pattern_ops,
+                # correcto con cualquier collation.
+                condition |= Q(**{f'{field}__startswith': term})
+        return queryset.filter(condition), False
+
+
+class ScalableAdmin(PrefixSearchMixin, admin.ModelAdmin):
+    """
+    Base para los changelists con millones de filas: paginación
+    estimada y búsqueda por índice (ver PrefixSearchMixin).
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_changelist(self, request, **kwargs):
+        return EstimatedCountChangeList
+
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
     list_display = ('name',)
+    search_fields = ('name',)
+
+@admin.register(SLAPolicy)
+class SLAPolicyAdmin(admin.ModelAdmin):
+    list_display = ('priority', 'category', 'first_response_minutes', 'resolution_minutes', 'escalate_to')
+    list_filter = ('priority',)
+    list_select_related = ('category', 'escalate_to')
+    autocomplete_fields = ('category', 'escalate_to')
 
 @admin.register(Ticket)
-class TicketAdmin(admin.ModelAdmin):
+class TicketAdmin(ScalableAdmin):
     list_display = ('id', 'title', 'status', 'priority', 'category', 'created_by', 'assigned_to')
     list_filter = ('status', 'priority', 'category')
-    search_fields = ('title', 'description')
+    list_select_related = ('category', 'created_by', 'assigned_to')
+    autocomplete_fields = ('category', 'created_by', 'assigned_to')
+    date_hierarchy = 'created_at'
+    search_fields = ('title',)
+    search_help_text = 'Número de ticket o inicio del título (distingue mayúsculas).'
+    prefix_search_fields = ('title',)
+
+    def save_model(self, request, obj, form, change):
+        obj.changed_by = request.user
+        super().save_model(request, obj, form, change)
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(ScalableAdmin):
     list_display = ('id', 'ticket', 'user', 'created_at')
-    search_fields = ('content',)
\ No newline at end of file
+    list_select_related = ('ticket', 'user')
+    autocomplete_fields = ('ticket', 'user')
+    date_hierarchy = 'created_at'
+    search_fields = ('ticket__id',)
+    search_help_text = 'Número de ticket.'
+    id_search_field = 'ticket_id'
\ No newline at end of file
@@ -0,0 +1,155 @@
+from django.db.models import Prefetch
+from django.http import JsonResponse
+from django.views import View
+from rest_framework import exceptions, status
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+from rest_framework.authtoken.models import Token
+from .models import Category, Ticket, Comment
+from .serializers import CategorySerializer, TicketSerializer, TicketListSerializer
+from .permissions import IsOwnerOrAgent
+from .views import tickets_for_user, with_list_data
+
+
+async def aauthenticate(request):
+    """
+    Versión asíncrona de TokenAuthentication: mismo header
+    ("Authorization: Token <key>"), mismos mensajes de error,
+    pero la búsqueda del token usa el ORM asíncrono.
+    Devuelve el usuario o None si no se enviaron credenciales.
+    """
+    auth = get_authorization_header(request).split()
+    keyword = TokenAuthentication.keyword
+
+    if not auth or auth[0].lower() != keyword.lower().encode():
+        return None
+
+    if len(auth) == 1:
+        raise exceptions.AuthenticationFailed('Invalid token header. No credentials provided.')
+    elif len(auth) > 2:
+        raise exceptions.AuthenticationFailed('Invalid token header. Token string should not contain spaces.')
+
+    try:
+        key = auth[1].decode()
+    except UnicodeError:
+        raise exceptions.AuthenticationFailed('Invalid token header. Token string should not contain invalid characters.')
+
+    try:
+        token = await Token.objects.select_related('user').aget(key=key)
+    except Token.DoesNotExist:
+        raise exceptions.AuthenticationFailed('Invalid token.')
+
+    if not token.user.is_active:
+        raise exceptions.AuthenticationFailed('User inactive or deleted.')
+
+    return token.user
+
+
+class AsyncAPIView(View):
+    """
+    Vista base asíncrona para los endpoints de solo lectura.
+    No pasa por DRF (que es síncrono) pero respeta sus reglas:
+    autenticación por token, IsAuthenticated y errores en formato
+    {"detail": ...} con los mismos códigos de estado.
+    """
+    http_method_names = ['get', 'head', 'options']
+    authentication_required = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            request.user = await aauthenticate(request)
+            if self.authentication_required and request.user is None:
+                raise exceptions.NotAuthenticated()
+            return await super().dispatch(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            response = JsonResponse({'detail': exc.detail}, status=exc.status_code)
+            if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+                response['WWW-Authenticate'] = TokenAuthentication.keyword
+            return response
+
+    async def http_method_not_allowed(self, request, *args, **kwargs):
+        exc = exceptions.MethodNotAllowed(request.method)
+        response = JsonResponse({'detail': exc.detail}, status=exc.status_code)
+        response['Allow'] = ', '.join(self._allowed_methods())
+        return response
+
+    def check_object_permissions(self, request, obj):
+        """
+        Reutiliza las clases de permisos de DRF a nivel de objeto.
+        """
+        for permission in self.permission_classes:
+            if not permission().has_object_permission(request, self, obj):
+                raise exceptions.PermissionDenied()
+
+
+class AsyncHealthCheckView(AsyncAPIView):
+    """
+    Igual que HealthCheckView, pero sin ocupar un hilo bajo ASGI.
+    """
+    authentication_required = False
+
+    async def get(self, request, *args, **kwargs):
+        return JsonResponse(
+            {"status": "ok", "message": "Backend TicketFlow funcionando!"},
+            status=status.HTTP_200_OK
+        )
+
+
+class AsyncCategoryListView(AsyncAPIView):
+    """
+    Listado de categorías (solo lectura).
+    """
+    async def get(self, request, *args, **kwargs):
+        categories = [category async for category in Category.objects.all()]
+        return JsonResponse(CategorySerializer(categories, many=True).data, safe=False)
+
+
+class AsyncCategoryDetailView(AsyncAPIView):
+    """
+    Detalle de una categoría (solo lectura).
+    """
+    async def get(self, request, pk, *args, **kwargs):
+        try:
+            category = await Category.objects.aget(pk=pk)
+        except Category.DoesNotExist:
+            raise exceptions.NotFound('No Category matches the given query.')
+        except (TypeError, ValueError):
+            # Igual que DRF con un pk no válido
+            raise exceptions.NotFound()
+        return JsonResponse(CategorySerializer(category).data)
+
+
+class AsyncTicketListView(AsyncAPIView):
+    """
+    Listado de tickets filtrado por rol, igual que TicketViewSet.list.
+    """
+    async def get(self, request, *args, **kwargs):
+        tickets = [ticket async for ticket in with_list_data(tickets_for_user(request.user))]
+        return JsonResponse(TicketListSerializer(tickets, many=True).data, safe=False)
+
+
+class AsyncTicketDetailView(AsyncAPIView):
+    """
+    Detalle de un ticket con sus comentarios.
+    Igual que en TicketViewSet: 404 si el ticket no es visible para
+    el usuario y luego se aplica IsOwnerOrAgent.
+    """
+    permission_classes = [IsOwnerOrAgent]
+
+    async def get(self, request, pk, *args, **kwargs):
+        # Todo lo que lee el serializador se trae antes: no se puede
+        # consultar la base de datos de forma síncrona desde el event loop
+        queryset = (
+            tickets_for_user(request.user)
+            .select_related('category', 'created_by', 'assigned_to')
+            .prefetch_related(Prefetch('comments', queryset=Comment.objects.select_related('user')))
+        )
+        try:
+            ticket = await queryset.aget(pk=pk)
+        except Ticket.DoesNotExist:
+            raise exceptions.NotFound('No Ticket matches the given query.')
+        except (TypeError, ValueError):
+            # Igual que DRF con un pk no válido
+            raise exceptions.NotFound()
+
+        self.check_object_permissions(request, ticket)
+        return JsonResponse(TicketSerializer(ticket).data)
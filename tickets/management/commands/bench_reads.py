@@ -0,0 +1,72 @@
+import asyncio
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient
+from rest_framework.authtoken.models import Token
+from users.models import CustomUser
+
+
+ENDPOINTS = {
+    'health': ('/api/tickets/health/', '/api/tickets/async/health/'),
+    'categories': ('/api/tickets/categories/', '/api/tickets/async/categories/'),
+    'tickets': ('/api/tickets/tickets/', '/api/tickets/async/tickets/'),
+}
+
+
+class Command(BaseCommand):
+    """
+    Compara el throughput de las lecturas síncronas (DRF) contra las
+    asíncronas lanzando N peticiones concurrentes contra el handler ASGI
+    dentro del mismo proceso (AsyncClient). No abre conexiones reales:
+    mide la concurrencia del handler, no la de un servidor.
+
+    No escribe nada: el usuario debe tener ya su token.
+
+    Uso:
+        python manage.py bench_reads --username agente1 --endpoint tickets
+    """
+    help = 'Benchmark en proceso de peticiones concurrentes: vistas síncronas vs asíncronas bajo ASGI.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', required=True, help='Usuario con el que se autentican las peticiones.')
+        parser.add_argument('--endpoint', choices=sorted(ENDPOINTS), default='tickets')
+        parser.add_argument('--requests', type=int, default=500, help='Peticiones totales por ruta.')
+        parser.add_argument('--concurrency', type=int, default=50, help='Peticiones concurrentes en proceso.')
+
+    def handle(self, *args, **options):
+        try:
+            user = CustomUser.objects.get(username=options['username'])
+        except CustomUser.DoesNotExist:
+            raise CommandError(f"No existe el usuario '{options['username']}'.")
+        try:
+            token = Token.objects.get(user=user)
+        except Token.DoesNotExist:
+            raise CommandError(f"El usuario '{user.username}' no tiene token.")
+
+        sync_url, async_url = ENDPOINTS[options['endpoint']]
+        for label, url in (('sync', sync_url), ('async', async_url)):
+            elapsed, failures = asyncio.run(
+                self.run(url, token.key, options['requests'], options['concurrency'])
+            )
+            self.stdout.write(
+                f"{label:<5} {url:<32} {options['requests'] / elapsed:8.1f} req/s "
+                f"({elapsed:.2f}s, {failures} errores)"
+            )
+
+    async def run(self, url, key, total, concurrency):
+        client = AsyncClient()
+        headers = {'Authorization': f'Token {key}'}
+        pending = iter(range(total))
+        failures = 0
+
+        async def worker():
+            nonlocal failures
+            for _ in pending:
+                response = await client.get(url, headers=headers)
+                if response.status_code != 200:
+                    failures += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - start, failures
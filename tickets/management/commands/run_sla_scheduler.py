@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from tickets.sla import SLAScheduler
+
+
+class Command(BaseCommand):
+    """
+    Proceso que escala los tickets que incumplen su SLA.
+
+    Uso:
+        python manage.py run_sla_scheduler --interval 60
+        python manage.py run_sla_scheduler --once   (ej. desde cron)
+    """
+    help = 'Escala periódicamente los tickets que incumplen su SLA.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Procesa una sola vez y termina.')
+        parser.add_argument('--interval', type=int, default=60, help='Segundos entre pasadas.')
+        parser.add_argument('--batch-size', type=int, default=500, help='Tickets por transacción.')
+
+    def handle(self, *args, **options):
+        scheduler = SLAScheduler(batch_size=options['batch_size'])
+        if options['once']:
+            escalated = scheduler.run_once()
+            self.stdout.write(f'{escalated} tickets escalados.')
+        else:
+            scheduler.run_forever(options['interval'])
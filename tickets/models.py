@@ -1,5 +1,10 @@
-from django.db import models
+from contextvars import ContextVar
+from datetime import timedelta
+
+from django.db import models, transaction
+from django.db.models import Q
 from django.conf import settings
+from django.utils import timezone
 
 
 USER_MODEL = settings.AUTH_USER_MODEL
@@ -14,6 +19,164 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+# Campos cuyo historial se guarda en TicketActivity (nombre, attname)
+TRACKED_FIELDS = (
+    ('title', 'title'),
+    ('description', 'description'),
+    ('status', 'status'),
+    ('priority', 'priority'),
+    ('category', 'category_id'),
+    ('assigned_to', 'assigned_to_id'),
+)
+
+# Activo mientras bulk_update guarda: el historial ya lo calculó él
+_recording_suppressed = ContextVar('ticket_activity_recording_suppressed', default=False)
+
+def tracked_attnames(fields):
+    """
+    Attnames de TRACKED_FIELDS presentes en `fields` (nombres o attnames).
+    None significa todos.
+    """
+    return [
+        attname for name, attname in TRACKED_FIELDS
+        if fields is None or name in fields or attname in fields
+    ]
+
+# Campos que cambian los plazos del SLA (y los que solo cambian si siguen pendientes)
+SLA_TERMS_FIELDS = {'priority', 'category', 'category_id'}
+SLA_STATE_FIELDS = SLA_TERMS_FIELDS | {'status'}
+SLA_FIELDS = ['first_response_due', 'resolution_due', 'next_breach_at']
+
+# Campos de texto: el historial no copia su contenido
+TEXT_FIELDS = {'title', 'description'}
+
+class TicketQuerySet(models.QuerySet):
+    # Filas por SELECT/UPDATE/INSERT del historial; mantiene los pk__in
+    # por debajo del límite de variables de SQLite
+    chunk_size = 500
+
+    def refresh_sla(self, tickets, recompute_deadlines, policies=None):
+        """
+        Lo que Ticket.save() hace con el SLA, para las escrituras masivas:
+        recalcula los plazos si cambió la prioridad o la categoría y
+        siempre `next_breach_at` (p. ej. None al cerrar).
+        Devuelve los tickets modificados en memoria, sin guardar.
+        """
+        if recompute_deadlines:
+            policies = policies if policies is not None else SLAPolicy.by_key()
+        for ticket in tickets:
+            if recompute_deadlines:
+                ticket.set_deadlines(SLAPolicy.match(policies, ticket), ticket.created_at)
+            ticket.refresh_next_breach()
+        return tickets
+
+    def update(self, **kwargs):
+        """
+        Las actualizaciones masivas también quedan en el historial.
+        Recorre las filas por pk en bloques de `chunk_size`: bloquea y lee
+        los valores anteriores, actualiza el bloque e inserta sus
+        actividades. Si los valores nuevos son literales salen de `kwargs`;
+        solo las expresiones (F(), Case...) obligan a releer el bloque.
+        """
+        attnames = tracked_attnames(kwargs)
+        if not attnames or _recording_suppressed.get():
+            return super().update(**kwargs)
+
+        literals, expressions = {}, []
+        for name, attname in TRACKED_FIELDS:
+            if attname not in attnames:
+                continue
+            value = kwargs[name] if name in kwargs else kwargs[attname]
+            if hasattr(value, 'resolve_expression'):
+                expressions.append(attname)
+            else:
+                literals[attname] = value.pk if isinstance(value, models.Model) else value
+
+        base = self.model._base_manager.using(self.db)
+        queryset = self.select_for_update().order_by('pk')
+        refresh_sla = bool(SLA_STATE_FIELDS & kwargs.keys())
+        recompute_deadlines = bool(SLA_TERMS_FIELDS & kwargs.keys())
+        if not recompute_deadlines and literals.get('status') == 'closed':
+            # Cerrar no deja plazos pendientes: va en el mismo UPDATE
+            kwargs = {**kwargs, 'next_breach_at': None}
+            refresh_sla = False
+        policies = SLAPolicy.by_key() if recompute_deadlines else None
+        rows = 0
+        last_pk = None
+        with transaction.atomic(using=self.db, savepoint=False):
+            while True:
+                chunk = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+                before = list(chunk.values('pk', *attnames)[:self.chunk_size])
+                if not before:
+                    return rows
+                pks = [row['pk'] for row in before]
+                last_pk = pks[-1]
+                rows += base.filter(pk__in=pks).update(**kwargs)
+
+                if refresh_sla:
+                    tickets = self.refresh_sla(base.filter(pk__in=pks), recompute_deadlines, policies)
+                    base.bulk_update(tickets, SLA_FIELDS)
+
+                after = {}
+                if expressions:
+                    after = {row['pk']: row for row in base.filter(pk__in=pks).values('pk', *expressions)}
+                TicketActivity.objects.using(self.db).bulk_create([
+                    TicketActivity(ticket_id=row['pk'], changes=diff)
+                    for row in before
+                    if (diff := diff_values(row, {**literals, **after.get(row['pk'], {})}, attnames))
+                ])
+
+    def bulk_update(self, objs, fields, batch_size=None):
+        """
+        Los valores nuevos salen de los propios objetos: solo se leen
+        (bloqueados) los anteriores y se hace un INSERT con los cambios.
+        """
+        attnames = tracked_attnames(fields)
+        if not attnames or _recording_suppressed.get():
+            return super().bulk_update(objs, fields, batch_size=batch_size)
+
+        objs = list(objs)
+        # Si quien llama no guarda el SLA (como hace el escalador), se recalcula aquí
+        if SLA_STATE_FIELDS & set(fields) and 'next_breach_at' not in fields:
+            self.refresh_sla(objs, bool(SLA_TERMS_FIELDS & set(fields)))
+            fields = [*fields, *SLA_FIELDS]
+        base = self.model._base_manager.using(self.db)
+        activities = []
+        with transaction.atomic(using=self.db, savepoint=False):
+            for start in range(0, len(objs), self.chunk_size):
+                batch = objs[start:start + self.chunk_size]
+                before = {
+                    row['pk']: row
+                    for row in base.select_for_update().filter(pk__in=[obj.pk for obj in batch]).values('pk', *attnames)
+                }
+                for obj in batch:
+                    diff = diff_values(before.get(obj.pk, {}), obj.tracked_values(), attnames)
+                    if diff:
+                        activities.append(TicketActivity(ticket_id=obj.pk, changes=diff))
+
+            token = _recording_suppressed.set(True)
+            try:
+                rows = super().bulk_update(objs, fields, batch_size=batch_size)
+            finally:
+                _recording_suppressed.reset(token)
+            TicketActivity.objects.using(self.db).bulk_create(activities, batch_size=self.chunk_size)
+
+        for obj in objs:
+            obj.remember_values(attnames)
+        return rows
+
+def diff_values(old, new, attnames):
+    """
+    Diferencias {campo: [antes, después]} entre dos snapshots.
+    De los TEXT_FIELDS solo se guarda que cambiaron ({campo: true}).
+    """
+    names = {attname: name for name, attname in TRACKED_FIELDS}
+    return {
+        names[attname]: True if attname in TEXT_FIELDS else [old.get(attname), new.get(attname)]
+        for attname in attnames
+        if old.get(attname) != new.get(attname)
+    }
+
 class Ticket(models.Model):
     """
     El modelo principal para un ticket de soporte.
@@ -56,9 +219,199 @@ class Ticket(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # --- SLA ---
+    first_response_due = models.DateTimeField(null=True, blank=True)
+    resolution_due = models.DateTimeField(null=True, blank=True)
+    first_responded_at = models.DateTimeField(null=True, blank=True)
+    first_response_breached = models.BooleanField(default=False)
+    resolution_breached = models.BooleanField(default=False)
+    # Próximo plazo pendiente; el escalador solo busca por este campo.
+    next_breach_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = TicketQuerySet.as_manager()
+
+    # Usuario que hace el cambio; lo asignan la vista y el admin antes de save()
+    changed_by = None
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['next_breach_at'],
+                condition=Q(next_breach_at__isnull=False),
+                name='ticket_next_breach_idx'
+            ),
+            # Búsqueda por prefijo y date_hierarchy del admin
+            models.Index(fields=['title'], name='ticket_title_idx', opclasses=['varchar_pattern_ops']),
+            models.Index(fields=['created_at'], name='ticket_created_at_idx'),
+        ]
+
     def __str__(self):
         return f"Ticket #{self.id}: {self.title}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._tracked_values = instance.tracked_values()
+        return instance
+
+    def tracked_values(self):
+        # Sin getattr para no cargar campos diferidos (.only()/.defer())
+        return {attname: self.__dict__[attname] for _, attname in TRACKED_FIELDS if attname in self.__dict__}
+
+    def remember_values(self, attnames):
+        """
+        Marca como guardados (iguales a la base de datos) los valores
+        actuales de `attnames`; el resto del snapshot no cambia.
+        """
+        current = self.tracked_values()
+        snapshot = getattr(self, '_tracked_values', {})
+        snapshot.update({attname: current[attname] for attname in attnames if attname in current})
+        self._tracked_values = snapshot
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        self.remember_values(tracked_attnames(fields))
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        if adding and self.resolution_due is None:
+            self.apply_sla_policy(timezone.now())
+        elif not adding and self.sla_terms_changed(kwargs.get('update_fields')):
+            self.apply_sla_policy(self.created_at)
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {
+                    *kwargs['update_fields'], 'first_response_due', 'resolution_due', 'next_breach_at',
+                }
+        self.refresh_next_breach()
+        super().save(*args, **kwargs)
+
+        # Solo cuentan como guardados los campos que se escribieron
+        attnames = tracked_attnames(kwargs.get('update_fields'))
+        changes = diff_values(
+            getattr(self, '_tracked_values', {}),
+            self.tracked_values(),
+            # Al crear solo los campos que no son texto
+            [attname for attname in attnames if not (adding and attname in TEXT_FIELDS)],
+        )
+        self.remember_values(attnames)
+        if changes:
+            actor_id = self.changed_by.pk if self.changed_by else (self.created_by_id if adding else None)
+            TicketActivity.objects.create(ticket=self, user_id=actor_id, changes=changes)
+
+    def sla_terms_changed(self, update_fields=None):
+        """
+        True si cambió la prioridad o la categoría desde que se cargó el ticket.
+        """
+        loaded = getattr(self, '_tracked_values', {})
+        return any(
+            attname in loaded and loaded[attname] != self.__dict__.get(attname)
+            for name, attname in (('priority', 'priority'), ('category', 'category_id'))
+            if update_fields is None or name in update_fields or attname in update_fields
+        )
+
+    def apply_sla_policy(self, start):
+        """
+        Calcula los plazos de primera respuesta y resolución a partir
+        de la política que corresponda. Sin política, el ticket no tiene SLA.
+        """
+        self.set_deadlines(SLAPolicy.for_ticket(self), start)
+
+    def set_deadlines(self, policy, start):
+        """
+        Plazos contados desde `start` (la creación del ticket cuando se
+        recalculan por un cambio de prioridad o categoría). Los plazos ya
+        marcados como incumplidos no se vuelven a escalar.
+        """
+        if policy is None:
+            self.first_response_due = self.resolution_due = None
+            return
+        self.first_response_due = start + timedelta(minutes=policy.first_response_minutes)
+        self.resolution_due = start + timedelta(minutes=policy.resolution_minutes)
+
+    def pending_deadlines(self):
+        """
+        Plazos que todavía pueden incumplirse.
+        """
+        if self.status == 'closed':
+            return []
+        deadlines = []
+        if self.first_response_due and not self.first_responded_at and not self.first_response_breached:
+            deadlines.append(('first_response', self.first_response_due))
+        if self.resolution_due and not self.resolution_breached:
+            deadlines.append(('resolution', self.resolution_due))
+        return deadlines
+
+    def refresh_next_breach(self):
+        deadlines = [due for _, due in self.pending_deadlines()]
+        self.next_breach_at = min(deadlines) if deadlines else None
+
+class SLAPolicy(models.Model):
+    """
+    Plazos de atención por prioridad (y opcionalmente por categoría).
+    Una política sin categoría aplica a todas las categorías que no
+    tengan una propia.
+    """
+    priority = models.CharField(max_length=20, choices=Ticket.PRIORITY_CHOICES)
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='sla_policies'
+    )
+    first_response_minutes = models.PositiveIntegerField()
+    resolution_minutes = models.PositiveIntegerField()
+    escalate_to = models.ForeignKey(
+        USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        limit_choices_to={'role': 'agent'},
+        related_name='+',
+        help_text='Agente al que se reasigna el ticket cuando incumple el SLA.'
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['priority', 'category'], name='unique_sla_priority_category'),
+            models.UniqueConstraint(
+                fields=['priority'],
+                condition=Q(category__isnull=True),
+                name='unique_sla_default_priority'
+            ),
+        ]
+
+    def __str__(self):
+        return f"SLA {self.priority} / {self.category or 'todas'}"
+
+    @classmethod
+    def by_key(cls):
+        """
+        Todas las políticas indexadas por (prioridad, categoría) para
+        procesos masivos; se usa con `match`.
+        """
+        return {(p.priority, p.category_id): p for p in cls.objects.select_related('escalate_to')}
+
+    @staticmethod
+    def match(policies, ticket):
+        return (
+            policies.get((ticket.priority, ticket.category_id))
+            or policies.get((ticket.priority, None))
+        )
+
+    @classmethod
+    def for_ticket(cls, ticket):
+        """
+        Política más específica para el ticket: primero la de su
+        categoría y, si no existe, la general de su prioridad.
+        """
+        return (
+            cls.objects
+            .filter(Q(category_id=ticket.category_id) | Q(category__isnull=True), priority=ticket.priority)
+            .order_by(models.F('category').asc(nulls_last=True))
+            .first()
+        )
+
 class Comment(models.Model):
     """
     Modelo para los comentarios dentro de un ticket.
@@ -70,10 +423,68 @@ class Comment(models.Model):
     )
     user = models.ForeignKey(
         USER_MODEL,
-        on_delete=models.CASCADE 
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        help_text='Vacío para los comentarios generados por el sistema.'
     )
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='comment_created_at_idx'),
+        ]
+
     def __str__(self):
-        return f"Comentario de {self.user.username} en Ticket #{self.ticket.id}"
\ No newline at end of file
+        author = self.user.username if self.user else 'Sistema'
+        return f"Comentario de {author} en Ticket #{self.ticket_id}"
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+
+        # El primer comentario de un agente cuenta como primera respuesta
+        ticket = self.ticket
+        if adding and self.user and self.user.role == 'agent' and ticket.first_responded_at is None:
+            ticket.first_responded_at = self.created_at
+            ticket.save(update_fields=['first_responded_at', 'next_breach_at'])
+
+class TicketActivity(models.Model):
+    """
+    Historial de cambios de un ticket (solo inserción).
+    `changes` guarda únicamente los campos modificados: {campo: [antes, después]},
+    con IDs para las relaciones; para título y descripción solo {campo: true}.
+    Al crear el ticket se guardan sus valores iniciales salvo los de texto.
+    """
+    ticket = models.ForeignKey(
+        Ticket,
+        on_delete=models.CASCADE,
+        related_name='activities',
+        db_index=False
+    )
+    user = models.ForeignKey(
+        USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        help_text='Vacío para los cambios hechos por el sistema.'
+    )
+    changes = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            # Timeline de un ticket: WHERE ticket_id = ? ORDER BY id
+            models.Index(fields=['ticket', 'id'], name='activity_ticket_timeline_idx'),
+        ]
+
+    def __str__(self):
+        return f"Cambio en Ticket #{self.ticket_id}: {', '.join(self.changes)}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError('El historial de tickets es de solo inserción.')
+        super().save(*args, **kwargs)
\ No newline at end of file
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Category, Ticket, Comment
+from .models import Category, Ticket, Comment, TicketActivity
 from users.models import CustomUser
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -16,7 +16,7 @@ class CommentSerializer(serializers.ModelSerializer):
     """
     user = serializers.StringRelatedField(read_only=True)
     user_id = serializers.PrimaryKeyRelatedField(source='user', read_only=True)
-    user_role = serializers.CharField(source='user.role', read_only=True)
+    user_role = serializers.CharField(source='user.role', read_only=True, allow_null=True)
     
     content = serializers.CharField(write_only=True)
 
@@ -59,6 +59,7 @@ class TicketSerializer(serializers.ModelSerializer):
         fields = (
             'id', 'title', 'description', 'status', 'priority',
             'created_at', 'updated_at',
+            'first_response_due', 'resolution_due', 'first_responded_at',
             'category', 
             'category_name', 
             'created_by', 
@@ -68,7 +69,10 @@ class TicketSerializer(serializers.ModelSerializer):
             'comments', 
             'comment'
         )
-        read_only_fields = ('id', 'created_at', 'updated_at', 'created_by_id')
+        read_only_fields = (
+            'id', 'created_at', 'updated_at', 'created_by_id',
+            'first_response_due', 'resolution_due', 'first_responded_at'
+        )
 
 
 class TicketListSerializer(serializers.ModelSerializer):
@@ -79,12 +83,24 @@ class TicketListSerializer(serializers.ModelSerializer):
     created_by = serializers.StringRelatedField(read_only=True)
     assigned_to_username = serializers.StringRelatedField(source='assigned_to', read_only=True)
     category_name = serializers.StringRelatedField(source='category', read_only=True)
-    comments_count = serializers.IntegerField(source='comments.count', read_only=True)
+    comments_count = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = Ticket
         fields = (
             'id', 'title', 'status', 'priority',
             'category_name', 'created_by', 'assigned_to_username',
-            'comments_count', 'created_at', 'updated_at'
-        )
\ No newline at end of file
+            'comments_count', 'created_at', 'updated_at', 'resolution_due'
+        )
+
+
+class TicketActivitySerializer(serializers.ModelSerializer):
+    """
+    Serializador para el historial de cambios de un ticket.
+    """
+    user = serializers.StringRelatedField(read_only=True)
+    user_id = serializers.PrimaryKeyRelatedField(source='user', read_only=True)
+
+    class Meta:
+        model = TicketActivity
+        fields = ('id', 'user', 'user_id', 'changes', 'created_at')
\ No newline at end of file
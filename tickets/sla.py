@@ -0,0 +1,104 @@
+import time
+
+from django.db import transaction
+from django.utils import timezone
+from .models import Ticket, SLAPolicy, Comment
+
+
+ESCALATION = {'low': 'medium', 'medium': 'high', 'high': 'high'}
+
+BREACH_LABELS = {
+    'first_response': 'primera respuesta',
+    'resolution': 'resolución',
+}
+
+
+class SLAScheduler:
+    """
+    Escala los tickets que incumplen su SLA.
+
+    Solo consulta `next_breach_at` (indexado y nulo para los tickets
+    sin plazos pendientes), así que el coste depende de los tickets
+    vencidos y no del total de tickets abiertos. Procesa por lotes y
+    cada lote va en su propia transacción.
+
+    `clock` es cualquier callable que devuelva la hora actual; los
+    tests le pasan un reloj falso.
+    """
+
+    def __init__(self, clock=timezone.now, batch_size=500):
+        self.clock = clock
+        self.batch_size = batch_size
+
+    def run_once(self):
+        """
+        Escala todo lo vencido hasta ahora. Devuelve cuántos tickets escaló.
+        """
+        now = self.clock()
+        policies = SLAPolicy.by_key()
+        total = 0
+        while True:
+            processed, escalated = self.escalate_batch(now, policies)
+            total += escalated
+            if processed < self.batch_size:
+                return total
+
+    def run_forever(self, interval=60):
+        while True:
+            self.run_once()
+            time.sleep(interval)
+
+    @transaction.atomic
+    def escalate_batch(self, now, policies):
+        tickets = list(
+            Ticket.objects
+            .select_for_update(skip_locked=True)
+            .filter(next_breach_at__lte=now)
+            .order_by('next_breach_at')[:self.batch_size]
+        )
+        comments = [
+            comment for comment in (self.escalate(ticket, now, policies) for ticket in tickets)
+            if comment is not None
+        ]
+
+        Ticket.objects.bulk_update(tickets, [
+            'priority', 'assigned_to', 'first_response_due', 'resolution_due',
+            'first_response_breached', 'resolution_breached', 'next_breach_at', 'updated_at',
+        ])
+        Comment.objects.bulk_create(comments)
+        return len(tickets), len(comments)
+
+    def escalate(self, ticket, now, policies):
+        """
+        Marca como incumplidos los plazos vencidos, sube la prioridad,
+        reasigna según la política y devuelve el comentario del sistema
+        (sin guardar).
+
+        Si `next_breach_at` estaba desactualizado (ningún plazo pendiente
+        vencido) solo se corrige y devuelve None.
+        """
+        breached = [kind for kind, due in ticket.pending_deadlines() if due <= now]
+        if not breached:
+            ticket.refresh_next_breach()
+            return None
+        for kind in breached:
+            setattr(ticket, f'{kind}_breached', True)
+
+        policy = SLAPolicy.match(policies, ticket)
+        ticket.priority = ESCALATION[ticket.priority]
+        if policy and policy.escalate_to and policy.escalate_to.role == 'agent':
+            ticket.assigned_to_id = policy.escalate_to_id
+        # Los plazos pasan a ser los de la nueva prioridad
+        ticket.set_deadlines(SLAPolicy.match(policies, ticket), ticket.created_at)
+        ticket.refresh_next_breach()
+        ticket.updated_at = now
+
+        labels = ', '.join(BREACH_LABELS[kind] for kind in breached)
+        return Comment(
+            ticket=ticket,
+            user=None,
+            content=(
+                f"SLA incumplido ({labels}). Prioridad: "
+                f"{ticket.get_priority_display()}. Ticket escalado automáticamente."
+            ),
+        )
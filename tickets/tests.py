@@ -1,3 +1,546 @@
+from datetime import datetime, timedelta, timezone
+
+from django.core.exceptions import ValidationError
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from unittest import mock
+from rest_framework.authtoken.models import Token
+from users.models import CustomUser
+from .models import Category, Ticket, Comment, SLAPolicy, TicketActivity, TicketQuerySet
+from .sla import SLAScheduler
+from .admin import EstimatedCountPaginator, TicketAdmin
+
+
+class AsyncReadViewsTests(TestCase):
+    """
+    Las lecturas asíncronas deben responder igual que las de DRF.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = CustomUser.objects.create_user('agente', password='x', role='agent')
+        cls.client_a = CustomUser.objects.create_user('cliente_a', password='x')
+        cls.client_b = CustomUser.objects.create_user('cliente_b', password='x')
+        cls.category = Category.objects.create(name='Soporte')
+        cls.ticket_a = Ticket.objects.create(
+            title='A', description='a', category=cls.category,
+            created_by=cls.client_a, assigned_to=cls.agent,
+        )
+        cls.ticket_b = Ticket.objects.create(
+            title='B', description='b', category=cls.category, created_by=cls.client_b,
+        )
+        Comment.objects.create(ticket=cls.ticket_a, user=cls.agent, content='hola')
+
+    def auth(self, user):
+        return {'HTTP_AUTHORIZATION': f'Token {Token.objects.get(user=user).key}'}
+
+    async def aauth(self, user):
+        token = await Token.objects.aget(user=user)
+        return {'Authorization': f'Token {token.key}'}
+
+    def test_list_matches_sync(self):
+        for user in (self.agent, self.client_a):
+            sync = self.client.get('/api/tickets/tickets/', **self.auth(user))
+            async_ = self.client.get('/api/tickets/async/tickets/', **self.auth(user))
+            self.assertEqual(async_.status_code, 200)
+            self.assertEqual(async_.json(), sync.json())
+
+    def test_retrieve_matches_sync(self):
+        url = f'tickets/{self.ticket_a.pk}/'
+        sync = self.client.get(f'/api/tickets/{url}', **self.auth(self.client_a))
+        async_ = self.client.get(f'/api/tickets/async/{url}', **self.auth(self.client_a))
+        self.assertEqual(async_.status_code, 200)
+        self.assertEqual(async_.json(), sync.json())
+
+    def test_only_list_counts_comments(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(f'/api/tickets/tickets/{self.ticket_a.pk}/', **self.auth(self.agent))
+        self.assertFalse(any('GROUP BY' in q['sql'] for q in ctx.captured_queries))
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get('/api/tickets/tickets/', **self.auth(self.agent))
+        self.assertTrue(any('GROUP BY' in q['sql'] for q in ctx.captured_queries))
+
+    def test_client_cannot_see_other_tickets(self):
+        response = self.client.get(f'/api/tickets/async/tickets/{self.ticket_b.pk}/', **self.auth(self.client_a))
+        self.assertEqual(response.status_code, 404)
+
+    def test_categories_match_sync(self):
+        sync = self.client.get('/api/tickets/categories/', **self.auth(self.client_a))
+        async_ = self.client.get('/api/tickets/async/categories/', **self.auth(self.client_a))
+        self.assertEqual(async_.json(), sync.json())
+
+    def test_authentication_errors(self):
+        response = self.client.get('/api/tickets/async/tickets/')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['WWW-Authenticate'], 'Token')
+
+        response = self.client.get('/api/tickets/async/tickets/', HTTP_AUTHORIZATION='Token nope')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json(), {'detail': 'Invalid token.'})
+
+    def test_method_not_allowed_matches_sync(self):
+        sync = self.client.post('/api/tickets/categories/', **self.auth(self.agent))
+        async_ = self.client.post('/api/tickets/async/categories/', **self.auth(self.agent))
+        self.assertEqual(async_.status_code, 405)
+        self.assertEqual(async_.json(), sync.json())
+
+    def test_invalid_pk_matches_sync(self):
+        sync = self.client.get('/api/tickets/tickets/abc/', **self.auth(self.agent))
+        async_ = self.client.get('/api/tickets/async/tickets/abc/', **self.auth(self.agent))
+        self.assertEqual(async_.status_code, 404)
+        self.assertEqual(async_.json(), sync.json())
+
+    def test_health_is_public(self):
+        response = self.client.get('/api/tickets/async/health/')
+        self.assertEqual(response.json()['status'], 'ok')
+
+    async def test_async_client(self):
+        response = await self.async_client.get(
+            '/api/tickets/async/tickets/', headers=await self.aauth(self.agent)
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 2)
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, **kwargs):
+        self.now += timedelta(**kwargs)
+
+
+class SLASchedulerTests(TestCase):
+    """
+    Escalado de SLA con un reloj falso para que los plazos sean deterministas.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = CustomUser.objects.create_user('agente', password='x', role='agent')
+        cls.lead = CustomUser.objects.create_user('lider', password='x', role='agent')
+        cls.customer = CustomUser.objects.create_user('cliente', password='x')
+        cls.category = Category.objects.create(name='Soporte')
+        cls.billing = Category.objects.create(name='Facturación')
+        SLAPolicy.objects.create(
+            priority='low', first_response_minutes=60, resolution_minutes=480, escalate_to=cls.lead,
+        )
+        SLAPolicy.objects.create(
+            priority='low', category=cls.billing, first_response_minutes=10, resolution_minutes=30,
+        )
+        SLAPolicy.objects.create(priority='medium', first_response_minutes=30, resolution_minutes=240)
+
+    def setUp(self):
+        self.clock = FakeClock(datetime(2025, 1, 6, 9, 0, tzinfo=timezone.utc))
+
+    def create_ticket(self, **kwargs):
+        fields = {'category': self.category, 'assigned_to': self.agent, **kwargs}
+        ticket = Ticket(title='t', description='d', created_by=self.customer, **fields)
+        ticket.apply_sla_policy(self.clock())
+        ticket.save()
+        # Los plazos recalculados se cuentan desde la creación
+        Ticket.objects.filter(pk=ticket.pk).update(created_at=self.clock())
+        ticket.refresh_from_db()
+        return ticket
+
+    def test_deadlines_follow_policy(self):
+        ticket = self.create_ticket()
+        self.assertEqual(ticket.first_response_due, self.clock() + timedelta(minutes=60))
+        self.assertEqual(ticket.resolution_due, self.clock() + timedelta(minutes=480))
+        self.assertEqual(ticket.next_breach_at, ticket.first_response_due)
+
+        billing = self.create_ticket(category=self.billing)
+        self.assertEqual(billing.resolution_due, self.clock() + timedelta(minutes=30))
+
+        without_policy = self.create_ticket(priority='high')
+        self.assertIsNone(without_policy.resolution_due)
+        self.assertIsNone(without_policy.next_breach_at)
+
+    def test_priority_or_category_change_recomputes_deadlines(self):
+        ticket = self.create_ticket()
+        ticket.priority = 'medium'
+        ticket.save()
+        self.assertEqual(ticket.first_response_due, self.clock() + timedelta(minutes=30))
+        self.assertEqual(ticket.resolution_due, self.clock() + timedelta(minutes=240))
+
+        ticket.refresh_from_db()
+        ticket.priority = 'low'
+        ticket.category = self.billing
+        ticket.save(update_fields=['priority', 'category'])
+        ticket.refresh_from_db()
+        self.assertEqual(ticket.resolution_due, self.clock() + timedelta(minutes=30))
+
+        # Sin política para la nueva prioridad el ticket queda sin SLA
+        ticket.priority = 'high'
+        ticket.save()
+        self.assertIsNone(ticket.resolution_due)
+        self.assertIsNone(ticket.next_breach_at)
+
+    def test_escalation_applies_new_priority_deadlines(self):
+        ticket = self.create_ticket()
+        self.clock.advance(minutes=61)
+        SLAScheduler(clock=self.clock).run_once()
+        ticket.refresh_from_db()
+        self.assertEqual(ticket.priority, 'medium')
+        self.assertEqual(ticket.resolution_due, ticket.created_at + timedelta(minutes=240))
+        self.assertEqual(ticket.next_breach_at, ticket.resolution_due)
+
+    def test_escalate_to_only_agents(self):
+        policy = SLAPolicy(priority='high', first_response_minutes=1, resolution_minutes=2, escalate_to=self.customer)
+        with self.assertRaises(ValidationError):
+            policy.full_clean()
+
+        policy.save()
+        ticket = self.create_ticket(priority='high')
+        self.clock.advance(minutes=2)
+        SLAScheduler(clock=self.clock).run_once()
+        ticket.refresh_from_db()
+        self.assertEqual(ticket.assigned_to, self.agent)
+
+    def test_stale_next_breach_is_fixed_without_escalating(self):
+        ticket = self.create_ticket()
+        # Escritura que no pasa por Ticket ni TicketQuerySet
+        Ticket._base_manager.filter(pk=ticket.pk).update(status='closed')
+        self.clock.advance(days=1)
+        self.assertEqual(SLAScheduler(clock=self.clock).run_once(), 0)
+
+        ticket.refresh_from_db()
+        self.assertEqual(ticket.priority, 'low')
+        self.assertIsNone(ticket.next_breach_at)
+        self.assertFalse(ticket.comments.exists())
+
+    def test_bulk_close_clears_next_breach(self):
+        ticket = self.create_ticket()
+        Ticket.objects.filter(pk=ticket.pk).update(status='closed')
+        ticket.refresh_from_db()
+        self.assertIsNone(ticket.next_breach_at)
+
+        self.clock.advance(days=1)
+        self.assertEqual(SLAScheduler(clock=self.clock).run_once(), 0)
+        self.assertFalse(ticket.comments.exists())
+
+        # Reabrir vuelve a activar los plazos pendientes
+        Ticket.objects.filter(pk=ticket.pk).update(status='open')
+        ticket.refresh_from_db()
+        self.assertEqual(ticket.next_breach_at, ticket.first_response_due)
+
+    def test_bulk_priority_change_recomputes_deadlines(self):
+        ticket = self.create_ticket()
+        Ticket.objects.filter(pk=ticket.pk).update(priority='medium')
+        ticket.refresh_from_db()
+        self.assertEqual(ticket.resolution_due, self.clock() + timedelta(minutes=240))
+        self.assertEqual(ticket.next_breach_at, self.clock() + timedelta(minutes=30))
+
+        ticket.priority = 'high'
+        Ticket.objects.bulk_update([ticket], ['priority'])
+        ticket.refresh_from_db()
+        self.assertIsNone(ticket.resolution_due)
+        self.assertIsNone(ticket.next_breach_at)
+
+    def test_nothing_escalated_before_deadline(self):
+        self.create_ticket()
+        self.clock.advance(minutes=59)
+        self.assertEqual(SLAScheduler(clock=self.clock).run_once(), 0)
+
+    def test_first_response_breach_escalates(self):
+        ticket = self.create_ticket()
+        self.clock.advance(minutes=61)
+        self.assertEqual(SLAScheduler(clock=self.clock).run_once(), 1)
+
+        ticket.refresh_from_db()
+        self.assertEqual(ticket.priority, 'medium')
+        self.assertEqual(ticket.assigned_to, self.lead)
+        self.assertTrue(ticket.first_response_breached)
+        self.assertFalse(ticket.resolution_breached)
+        self.assertEqual(ticket.next_breach_at, ticket.resolution_due)
+
+        comment = ticket.comments.get()
+        self.assertIsNone(comment.user)
+        self.assertIn('primera respuesta', comment.content)
+
+        # Ya escalado: no se repite hasta el siguiente plazo
+        self.assertEqual(SLAScheduler(clock=self.clock).run_once(), 0)
+        self.clock.advance(hours=8)
+        self.assertEqual(SLAScheduler(clock=self.clock).run_once(), 1)
+        ticket.refresh_from_db()
+        self.assertEqual(ticket.priority, 'high')
+        self.assertIsNone(ticket.next_breach_at)
+
+    def test_agent_comment_stops_first_response_clock(self):
+        ticket = self.create_ticket()
+        Comment.objects.create(ticket=ticket, user=self.agent, content='Lo reviso')
+        ticket.refresh_from_db()
+        self.assertIsNotNone(ticket.first_responded_at)
+        self.assertEqual(ticket.next_breach_at, ticket.resolution_due)
+
+        self.clock.advance(minutes=61)
+        self.assertEqual(SLAScheduler(clock=self.clock).run_once(), 0)
+
+    def test_closed_tickets_are_not_escalated(self):
+        ticket = self.create_ticket()
+        ticket.status = 'closed'
+        ticket.save()
+        self.assertIsNone(ticket.next_breach_at)
+
+        self.clock.advance(days=1)
+        self.assertEqual(SLAScheduler(clock=self.clock).run_once(), 0)
+
+    def test_large_backlog_in_batches(self):
+        for _ in range(7):
+            self.create_ticket()
+        self.clock.advance(days=1)
+        self.assertEqual(SLAScheduler(clock=self.clock, batch_size=3).run_once(), 7)
+        self.assertEqual(Comment.objects.filter(user__isnull=True).count(), 7)
+        self.assertFalse(Ticket.objects.filter(next_breach_at__isnull=False).exists())
+
+
+class AdminChangelistTests(TestCase):
+    """
+    Los changelists del admin no deben crecer en consultas con el número de filas.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_superuser('admin', 'admin@example.com', 'x')
+        cls.category = Category.objects.create(name='Soporte')
+        cls.tickets = [
+            Ticket.objects.create(
+                title=f'Impresora {i}', description='d', category=cls.category,
+                created_by=CustomUser.objects.create_user(f'cliente{i}', password='x'),
+                assigned_to=cls.admin,
+            )
+            for i in range(5)
+        ]
+        Ticket.objects.create(title='Factura', description='d', category=cls.category, created_by=cls.admin)
+        for ticket in cls.tickets:
+            Comment.objects.create(ticket=ticket, user=ticket.created_by, content='c')
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_changelists_use_joins(self):
+        for url in ('/admin/tickets/ticket/', '/admin/tickets/comment/'):
+            many = self.count_queries(url)
+            one = self.count_queries(url + '?q=' + str(self.tickets[0].pk))
+            self.assertEqual(many, one)
+
+    def test_search_by_id_and_title_prefix(self):
+        response = self.client.get('/admin/tickets/ticket/', {'q': 'Impresora'})
+        self.assertEqual(response.context['cl'].result_count, 5)
+
+        response = self.client.get('/admin/tickets/ticket/', {'q': str(self.tickets[2].pk)})
+        self.assertEqual(list(response.context['cl'].result_list), [self.tickets[2]])
+
+        response = self.client.get('/admin/tickets/comment/', {'q': str(self.tickets[2].pk)})
+        self.assertEqual(response.context['cl'].result_count, 1)
+
+    def test_prefix_search_edge_characters(self):
+        emoji = Ticket.objects.create(title='Impresora \U0001F5A8', description='d', category=self.category, created_by=self.admin)
+        response = self.client.get('/admin/tickets/ticket/', {'q': 'Impresora '})
+        self.assertIn(emoji, response.context['cl'].result_list)
+        response = self.client.get('/admin/tickets/ticket/', {'q': 'Impresora \U0001F5A8'})
+        self.assertEqual(list(response.context['cl'].result_list), [emoji])
+
+    @mock.patch.object(EstimatedCountPaginator, 'COUNT_LIMIT', 3)
+    @mock.patch.object(TicketAdmin, 'list_per_page', 2)
+    def test_capped_count_pages_past_the_estimate(self):
+        response = self.client.get('/admin/tickets/ticket/')
+        self.assertEqual(response.context['cl'].paginator.count_kind, 'capped')
+        self.assertContains(response, 'Más de 3 tickets')
+        self.assertContains(response, 'Siguiente')
+
+        # La página 3 está más allá de COUNT_LIMIT y aun así se puede ver
+        response = self.client.get('/admin/tickets/ticket/', {'p': 3})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['cl'].result_list), 2)
+        self.assertContains(response, 'Anterior')
+
+        response = self.client.get('/admin/tickets/ticket/', {'p': 4})
+        self.assertEqual(list(response.context['cl'].result_list), [])
+        self.assertNotContains(response, 'Siguiente')
+
+        # Con filtros que caben en el límite el total es exacto
+        response = self.client.get('/admin/tickets/ticket/', {'q': 'Factura'})
+        self.assertTrue(response.context['cl'].paginator.count_is_exact)
+        self.assertNotContains(response, 'Más de')
+
+    def test_stock_paginator_changelists_keep_page_links(self):
+        Category.objects.bulk_create([Category(name=f'Categoría {i:03}') for i in range(150)])
+        response = self.client.get('/admin/tickets/category/')
+        self.assertContains(response, '?p=2')
+        self.assertNotContains(response, 'Aprox.')
+
+        response = self.client.get('/admin/tickets/category/', {'p': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['cl'].result_list), 51)
+
+    def test_user_search_uses_prefix_ranges(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/admin/users/customuser/', {'q': 'cliente'})
+        self.assertEqual(response.context['cl'].result_count, 5)
+        self.assertFalse(any('LIKE' in q['sql'] for q in ctx.captured_queries))
+
+        response = self.client.get('/admin/users/customuser/', {'q': 'admin@'})
+        self.assertEqual(list(response.context['cl'].result_list), [self.admin])
+
+    def test_autocomplete_for_users(self):
+        response = self.client.get('/admin/autocomplete/', {
+            'app_label': 'tickets', 'model_name': 'ticket', 'field_name': 'assigned_to', 'term': 'adm',
+        })
+        self.assertEqual([r['text'] for r in response.json()['results']], ['admin'])
+
+
+class TicketActivityTests(TestCase):
+    """
+    Historial de cambios: diffs por campo con un solo INSERT extra por escritura.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = CustomUser.objects.create_user('agente', password='x', role='agent')
+        cls.customer = CustomUser.objects.create_user('cliente', password='x')
+        cls.other = CustomUser.objects.create_user('otro', password='x')
+        cls.category = Category.objects.create(name='Soporte')
+        cls.ticket = Ticket.objects.create(
+            title='A', description='a', category=cls.category, created_by=cls.customer,
+        )
+
+    def auth(self, user):
+        return {'HTTP_AUTHORIZATION': f'Token {Token.objects.get(user=user).key}'}
+
+    def test_creation_is_recorded(self):
+        activity = self.ticket.activities.get()
+        self.assertEqual(activity.user, self.customer)
+        self.assertEqual(activity.changes, {
+            'status': [None, 'open'],
+            'priority': [None, 'low'],
+            'category': [None, self.category.pk],
+        })
+
+    def test_api_update_records_diff_with_one_insert(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.patch(
+                f'/api/tickets/tickets/{self.ticket.pk}/',
+                {'status': 'in_progress', 'assigned_to': self.agent.pk, 'title': 'A'},
+                content_type='application/json', **self.auth(self.agent),
+            )
+        self.assertEqual(response.status_code, 200)
+        activity_inserts = [q for q in ctx.captured_queries if 'INSERT INTO "tickets_ticketactivity"' in q['sql']]
+        self.assertEqual(len(activity_inserts), 1)
+
+        activity = self.ticket.activities.last()
+        self.assertEqual(activity.user, self.agent)
+        self.assertEqual(activity.changes, {
+            'status': ['open', 'in_progress'],
+            'assigned_to': [None, self.agent.pk],
+        })
+
+    def test_text_changes_are_not_copied(self):
+        ticket = Ticket.objects.get(pk=self.ticket.pk)
+        ticket.description = 'x' * 5000
+        ticket.save()
+        self.assertEqual(ticket.activities.last().changes, {'description': True})
+
+        Ticket.objects.filter(pk=ticket.pk).update(description='corta', status='closed')
+        self.assertEqual(ticket.activities.last().changes, {'description': True, 'status': ['open', 'closed']})
+
+    def test_save_without_changes_records_nothing(self):
+        ticket = Ticket.objects.get(pk=self.ticket.pk)
+        ticket.save()
+        self.assertEqual(ticket.activities.count(), 1)
+
+    def test_bulk_updates_are_recorded(self):
+        second = Ticket.objects.create(title='B', description='b', category=self.category, created_by=self.customer)
+        Ticket.objects.filter(pk__in=[self.ticket.pk, second.pk]).update(status='closed')
+        self.assertEqual(TicketActivity.objects.filter(changes__status=['open', 'closed']).count(), 2)
+
+        tickets = list(Ticket.objects.filter(pk__in=[self.ticket.pk, second.pk]))
+        for ticket in tickets:
+            ticket.priority = 'high'
+        Ticket.objects.bulk_update(tickets, ['priority'])
+        last = self.ticket.activities.last()
+        self.assertIsNone(last.user)
+        self.assertEqual(last.changes, {'priority': ['low', 'high']})
+
+    def test_refresh_from_db_updates_snapshot(self):
+        ticket = Ticket.objects.get(pk=self.ticket.pk)
+        Ticket.objects.filter(pk=ticket.pk).update(status='closed')
+        ticket.refresh_from_db()
+        ticket.changed_by = self.agent
+        ticket.priority = 'high'
+        ticket.save()
+
+        self.assertEqual(TicketActivity.objects.filter(changes__has_key='status', changes__status__1='closed').count(), 1)
+        last = ticket.activities.last()
+        self.assertEqual(last.user, self.agent)
+        self.assertEqual(last.changes, {'priority': ['low', 'high']})
+
+    def test_update_fields_only_marks_written_fields_as_saved(self):
+        ticket = Ticket.objects.get(pk=self.ticket.pk)
+        ticket.status = 'closed'
+        ticket.title = 'Nuevo'
+        ticket.save(update_fields=['title'])
+        self.assertEqual(ticket.activities.last().changes, {'title': True})
+
+        ticket.save()
+        self.assertEqual(ticket.activities.last().changes, {'status': ['open', 'closed']})
+
+    @mock.patch.object(TicketQuerySet, 'chunk_size', 2)
+    def test_bulk_update_in_chunks_without_reselecting_literals(self):
+        for i in range(4):
+            Ticket.objects.create(title=f'T{i}', description='d', category=self.category, created_by=self.customer)
+
+        with CaptureQueriesContext(connection) as ctx:
+            rows = Ticket.objects.filter(status='open').update(status='closed')
+        self.assertEqual(rows, 5)
+        self.assertEqual(TicketActivity.objects.filter(changes__status__1='closed').count(), 5)
+
+        selects = [q for q in ctx.captured_queries if q['sql'].startswith('SELECT')]
+        updates = [q for q in ctx.captured_queries if q['sql'].startswith('UPDATE')]
+        # 3 bloques (2 + 2 + 1) y un SELECT final vacío; sin relecturas
+        self.assertEqual(len(updates), 3)
+        self.assertEqual(len(selects), 4)
+
+    def test_bulk_update_reads_only_old_values(self):
+        tickets = list(Ticket.objects.all())
+        for ticket in tickets:
+            ticket.priority = 'medium'
+        with CaptureQueriesContext(connection) as ctx:
+            Ticket.objects.bulk_update(tickets, ['priority'])
+        ticket_selects = [q for q in ctx.captured_queries if q['sql'].startswith('SELECT') and 'FROM "tickets_ticket"' in q['sql']]
+        self.assertEqual(len(ticket_selects), 1)
+        self.assertEqual(len([q for q in ctx.captured_queries if 'INSERT INTO "tickets_ticketactivity"' in q['sql']]), 1)
+
+        # Ya guardado: un save() posterior no repite el cambio
+        count = tickets[0].activities.count()
+        tickets[0].save()
+        self.assertEqual(tickets[0].activities.count(), count)
+
+    def test_activity_is_append_only(self):
+        activity = self.ticket.activities.get()
+        with self.assertRaises(ValueError):
+            activity.save()
+
+    def test_history_endpoint(self):
+        self.ticket.changed_by = self.agent
+        self.ticket.status = 'closed'
+        self.ticket.save()
+
+        response = self.client.get(f'/api/tickets/tickets/{self.ticket.pk}/history/', **self.auth(self.customer))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([a['user'] for a in response.json()], ['cliente', 'agente'])
+        self.assertEqual(response.json()[1]['changes'], {'status': ['open', 'closed']})
 
-# Create your tests here.
+        response = self.client.get(f'/api/tickets/tickets/{self.ticket.pk}/history/', **self.auth(self.other))
+        self.assertEqual(response.status_code, 404)
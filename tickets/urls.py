@@ -1,12 +1,26 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import HealthCheckView, CategoryViewSet, TicketViewSet
+from .async_views import (
+    AsyncHealthCheckView, AsyncCategoryListView, AsyncCategoryDetailView,
+    AsyncTicketListView, AsyncTicketDetailView,
+)
 
 router = DefaultRouter()
 router.register(r'categories', CategoryViewSet, basename='category')
 router.register(r'tickets', TicketViewSet, basename='ticket')
 
+# Lecturas asíncronas (ASGI): mismas respuestas que las vistas de DRF
+async_urlpatterns = [
+    path('health/', AsyncHealthCheckView.as_view(), name='async_health_check'),
+    path('categories/', AsyncCategoryListView.as_view(), name='async_category_list'),
+    path('categories/<str:pk>/', AsyncCategoryDetailView.as_view(), name='async_category_detail'),
+    path('tickets/', AsyncTicketListView.as_view(), name='async_ticket_list'),
+    path('tickets/<str:pk>/', AsyncTicketDetailView.as_view(), name='async_ticket_detail'),
+]
+
 urlpatterns = [
     path('health/', HealthCheckView.as_view(), name='health_check'),
+    path('async/', include(async_urlpatterns)),
     path('', include(router.urls)), 
 ]
\ No newline at end of file
@@ -2,9 +2,10 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, viewsets, permissions
 from rest_framework.decorators import action
+from django.db.models import Count
 from .models import Category, Ticket, Comment
 # Importamos los serializers que sí usamos
-from .serializers import CategorySerializer, TicketSerializer, CommentSerializer, TicketListSerializer
+from .serializers import CategorySerializer, TicketSerializer, CommentSerializer, TicketListSerializer, TicketActivitySerializer
 from .permissions import IsAgent, IsOwnerOrAgent
 
 class HealthCheckView(APIView):
@@ -26,6 +27,27 @@ class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = CategorySerializer
     permission_classes = [permissions.IsAuthenticated]
 
+def tickets_for_user(user):
+    """
+    Tickets visibles para el usuario: todos si es agente, solo los
+    propios si es cliente. Lo comparten las vistas síncronas y las asíncronas.
+    """
+    queryset = Ticket.objects.order_by('-updated_at')
+    if user.role == 'agent':
+        return queryset
+    return queryset.filter(created_by=user)
+
+def with_list_data(queryset):
+    """
+    Solo para los listados: trae las relaciones en el mismo query y
+    anota el número de comentarios para no hacer N+1 consultas.
+    """
+    return (
+        queryset
+        .select_related('category', 'created_by', 'assigned_to')
+        .annotate(comments_count=Count('comments'))
+    )
+
 class TicketViewSet(viewsets.ModelViewSet):
     """
     Endpoint de API para Tickets (CRUD).
@@ -35,12 +57,10 @@ class TicketViewSet(viewsets.ModelViewSet):
         """
         Filtra los tickets basado en el rol del usuario.
         """
-        user = self.request.user
-        
-        if user.role == 'agent':
-            return Ticket.objects.all().order_by('-updated_at')
-        else:
-            return Ticket.objects.filter(created_by=user).order_by('-updated_at')
+        queryset = tickets_for_user(self.request.user)
+        if self.action == 'list':
+            return with_list_data(queryset)
+        return queryset
 
     def get_serializer_class(self):
         """
@@ -56,7 +76,7 @@ class TicketViewSet(viewsets.ModelViewSet):
         """
         Asigna permisos por acción.
         """
-        if self.action in ['retrieve', 'update', 'partial_update', 'destroy', 'add_comment']:
+        if self.action in ['retrieve', 'update', 'partial_update', 'destroy', 'add_comment', 'history']:
             self.permission_classes = [permissions.IsAuthenticated, IsOwnerOrAgent]
         elif self.action == 'create':
             self.permission_classes = [permissions.IsAuthenticated]
@@ -72,6 +92,13 @@ class TicketViewSet(viewsets.ModelViewSet):
         """
         serializer.save(created_by=self.request.user)
 
+    def perform_update(self, serializer):
+        """
+        Guarda quién hizo el cambio para el historial del ticket.
+        """
+        serializer.instance.changed_by = self.request.user
+        serializer.save()
+
     def update(self, request, *args, **kwargs):
         """
         Sobrescribimos el método update (PUT)
@@ -127,4 +154,15 @@ class TicketViewSet(viewsets.ModelViewSet):
             serializer.save(user=request.user, ticket=ticket)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=True, methods=['get'],
+            permission_classes=[permissions.IsAuthenticated, IsOwnerOrAgent])
+    def history(self, request, pk=None):
+        """
+        Historial de cambios del ticket, del más antiguo al más reciente.
+        URL: GET /api/tickets/tickets/{id}/history/
+        """
+        ticket = self.get_object()
+        activities = ticket.activities.select_related('user')
+        return Response(TicketActivitySerializer(activities, many=True).data)
\ No newline at end of file
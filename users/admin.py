@@ -1,3 +1,16 @@
 from django.contrib import admin
+from django.contrib.auth.admin import UserAdmin
+from tickets.admin import PrefixSearchMixin
+from .models import CustomUser
 
-# Register your models here.
+@admin.register(CustomUser)
+class CustomUserAdmin(PrefixSearchMixin, UserAdmin):
+    list_display = ('username', 'email', 'role', 'is_active')
+    list_filter = ('role', 'is_active', 'is_staff')
+    # Lo usan los autocompletados de tickets: prefijo sobre columnas indexadas
+    search_fields = ('username', 'email')
+    prefix_search_fields = ('username', 'email')
+    search_help_text = 'ID o inicio del usuario o email (distingue mayúsculas).'
+    fieldsets = UserAdmin.fieldsets + (
+        ('Rol', {'fields': ('role',)}),
+    )
\ No newline at end of file
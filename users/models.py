@@ -19,6 +19,12 @@ class CustomUser(AbstractUser):
     
     role = models.CharField(max_length=10, choices=ROLE_CHOICES, default='client')
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Búsqueda por prefijo del admin (username ya tiene índice único)
+            models.Index(fields=['email'], name='user_email_idx', opclasses=['varchar_pattern_ops']),
+        ]
+
     def __str__(self):
         return self.username
 